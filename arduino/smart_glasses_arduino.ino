@@ -3,15 +3,28 @@
 #include <Wire.h>
 
 // Pin definitions
+//
+// Pinout (changed from earlier revisions - rewire before flashing):
+//   Front sensor  TRIG 2, ECHO 3
+//   Left sensor   TRIG 4, ECHO 5
+//   Right sensor  TRIG 8, ECHO 7   (TRIG was pin 6)
+//   Motors        FRONT 6, LEFT 9, RIGHT 10   (FRONT was pin 8)
+//   GPS           RX 11, TX 12
+// The front motor moved to pin 6 because haptic intensity ramps need PWM,
+// which pin 8 lacks. Flashing this sketch onto the old wiring drives PWM
+// into the right sensor's trigger and trigger pulses into the front motor.
 const int TRIG_PIN_FRONT = 2;
 const int ECHO_PIN_FRONT = 3;
 const int TRIG_PIN_LEFT = 4;
 const int ECHO_PIN_LEFT = 5;
-const int TRIG_PIN_RIGHT = 6;
+const int TRIG_PIN_RIGHT = 8;
 const int ECHO_PIN_RIGHT = 7;
-const int VIBRATION_MOTOR_FRONT = 8;
+// Motors must sit on PWM pins (3, 5, 6, 9, 10, 11 on the Uno) for intensity ramps
+const int VIBRATION_MOTOR_FRONT = 6;
 const int VIBRATION_MOTOR_LEFT = 9;
 const int VIBRATION_MOTOR_RIGHT = 10;
+const int MOTOR_COUNT = 3;
+const int MOTOR_PINS[MOTOR_COUNT] = {VIBRATION_MOTOR_FRONT, VIBRATION_MOTOR_LEFT, VIBRATION_MOTOR_RIGHT};
 
 // GPS module connection
 SoftwareSerial gpsSerial(11, 12); // RX, TX
@@ -22,12 +35,32 @@ const float SPEED_OF_SOUND = 0.034; // cm/microsecond
 const int DANGER_THRESHOLD = 20; // cm
 const int ALERT_THRESHOLD = 50; // cm
 const unsigned long GPS_UPDATE_INTERVAL = 5000; // 5 seconds
+const unsigned long SENSOR_INTERVAL = 100; // ms between ultrasonic sweeps
+const unsigned long ECHO_TIMEOUT = 30000; // us, roughly 5m of range
+const float NO_ECHO_DISTANCE = 500; // cm, reported when nothing echoes back
+const int MAX_HAPTIC_STEPS = 18; // Must match MAX_PATTERN_STEPS in haptic_feedback.py
+const unsigned long HAPTIC_STEP_UNIT = 10; // ms per duration tick
+const int COMMAND_BUFFER_SIZE = 64;
 
 // Variables
 unsigned long lastGpsUpdate = 0;
+unsigned long lastSensorCheck = 0;
 float lastLatitude = 0;
 float lastLongitude = 0;
 
+// Haptic pattern state - steps are played back from loop() using millis()
+// so a pattern never blocks the ultrasonic sensors
+byte obstacleLevel[MOTOR_COUNT] = {0, 0, 0};
+byte hapticSteps[MAX_HAPTIC_STEPS][MOTOR_COUNT];
+unsigned long hapticDurations[MAX_HAPTIC_STEPS];
+int hapticStepCount = 0;
+int hapticStep = 0;
+unsigned long hapticStepStart = 0;
+
+// Serial command being received from Raspberry Pi
+char commandBuffer[COMMAND_BUFFER_SIZE];
+int commandLength = 0;
+
 void setup() {
   // Initialize serial communications
   Serial.begin(9600);
@@ -55,30 +88,33 @@ void setup() {
 }
 
 void loop() {
-  // Check ultrasonic sensors
-  checkUltrasonicSensors();
+  // Check ultrasonic sensors on a fixed cadence instead of delaying the loop
+  if (millis() - lastSensorCheck >= SENSOR_INTERVAL) {
+    lastSensorCheck = millis();
+    checkUltrasonicSensors();
+  }
   
   // Update GPS data
   updateGPS();
   
-  // Process any commands from Raspberry Pi
-  processSerialCommands();
-  
-  delay(100); // Small delay to prevent overwhelming the system
+  // Process any commands from Raspberry Pi and advance haptic patterns
+  serviceHaptics();
 }
 
 void checkUltrasonicSensors() {
   // Check front sensor
   float distanceFront = getDistance(TRIG_PIN_FRONT, ECHO_PIN_FRONT);
-  handleObstacle(distanceFront, VIBRATION_MOTOR_FRONT, "front");
+  handleObstacle(distanceFront, 0, "front");
+  serviceHaptics();
   
   // Check left sensor
   float distanceLeft = getDistance(TRIG_PIN_LEFT, ECHO_PIN_LEFT);
-  handleObstacle(distanceLeft, VIBRATION_MOTOR_LEFT, "left");
+  handleObstacle(distanceLeft, 1, "left");
+  serviceHaptics();
   
   // Check right sensor
   float distanceRight = getDistance(TRIG_PIN_RIGHT, ECHO_PIN_RIGHT);
-  handleObstacle(distanceRight, VIBRATION_MOTOR_RIGHT, "right");
+  handleObstacle(distanceRight, 2, "right");
 }
 
 float getDistance(int trigPin, int echoPin) {
@@ -92,7 +128,12 @@ float getDistance(int trigPin, int echoPin) {
   digitalWrite(trigPin, LOW);
   
   // Measure the response
-  long duration = pulseIn(echoPin, HIGH);
+  long duration = pulseIn(echoPin, HIGH, ECHO_TIMEOUT);
+  
+  // No echo within the timeout - nothing in range
+  if (duration == 0) {
+    return NO_ECHO_DISTANCE;
+  }
   
   // Calculate distance in cm
   float distance = duration * SPEED_OF_SOUND / 2;
@@ -100,11 +141,11 @@ float getDistance(int trigPin, int echoPin) {
   return distance;
 }
 
-void handleObstacle(float distance, int motorPin, String direction) {
+void handleObstacle(float distance, int motor, String direction) {
   // Handle obstacle detection
   if (distance <= DANGER_THRESHOLD) {
     // Dangerous obstacle - activate motor at full power
-    analogWrite(motorPin, 255);
+    obstacleLevel[motor] = 255;
     
     // Send alert to Raspberry Pi
     Serial.print("OBSTACLE:");
@@ -115,14 +156,119 @@ void handleObstacle(float distance, int motorPin, String direction) {
   else if (distance <= ALERT_THRESHOLD) {
     // Close obstacle - activate motor at proportional power
     int intensity = map(distance, DANGER_THRESHOLD, ALERT_THRESHOLD, 255, 50);
-    analogWrite(motorPin, intensity);
+    obstacleLevel[motor] = intensity;
     
     // No need to alert Raspberry Pi for non-dangerous obstacles
   } 
   else {
     // No obstacle - turn off motor
-    analogWrite(motorPin, 0);
+    obstacleLevel[motor] = 0;
+  }
+  
+  writeMotors();
+}
+
+void writeMotors() {
+  // Drive each motor at the stronger of the obstacle level and the active haptic step
+  for (int i = 0; i < MOTOR_COUNT; i++) {
+    byte level = obstacleLevel[i];
+    if (hapticStep < hapticStepCount && hapticSteps[hapticStep][i] > level) {
+      level = hapticSteps[hapticStep][i];
+    }
+    analogWrite(MOTOR_PINS[i], level);
+  }
+}
+
+void serviceHaptics() {
+  processSerialCommands();
+  updateHaptics();
+}
+
+void updateHaptics() {
+  // Advance the active pattern once the current step has run its time.
+  // Only one step is taken per call and its timer restarts from now, so a
+  // late check stretches a step rather than skipping the next one
+  if (hapticStep >= hapticStepCount) {
+    return;
+  }
+  
+  if (millis() - hapticStepStart >= hapticDurations[hapticStep]) {
+    hapticStep++;
+    hapticStepStart = millis();
+    writeMotors();
+  }
+}
+
+void startHapticPattern(int stepCount) {
+  // A new pattern replaces whatever is currently playing
+  hapticStepCount = stepCount;
+  hapticStep = 0;
+  hapticStepStart = millis();
+  writeMotors();
+}
+
+void startSingleVibration(int motor) {
+  // Legacy VIBRATE_* commands - one motor at full power for 500ms
+  for (int i = 0; i < MOTOR_COUNT; i++) {
+    hapticSteps[0][i] = (i == motor) ? 255 : 0;
+  }
+  hapticDurations[0] = 500;
+  startHapticPattern(1);
+}
+
+byte parseHexByte(const char *text) {
+  char digits[3] = {text[0], text[1], '\0'};
+  return (byte) strtol(digits, NULL, 16);
+}
+
+int parseHapticSteps(const char *command, int length, int firstStep) {
+  // Steps are 8 hex digits each after the command letter,
+  // FFLLRRDD = front, left, right intensity and duration in 10ms ticks
+  int stepCount = firstStep + (length - 1) / 8;
+  if (stepCount > MAX_HAPTIC_STEPS) {
+    stepCount = MAX_HAPTIC_STEPS;
+  }
+  
+  for (int step = firstStep; step < stepCount; step++) {
+    const char *stepText = command + 1 + (step - firstStep) * 8;
+    for (int i = 0; i < MOTOR_COUNT; i++) {
+      hapticSteps[step][i] = parseHexByte(stepText + i * 2);
+    }
+    hapticDurations[step] = parseHexByte(stepText + 6) * HAPTIC_STEP_UNIT;
   }
+  
+  return stepCount;
+}
+
+void handleCommand(const char *command, int length) {
+  if (command[0] == 'H') {
+    // H - start a new pattern
+    startHapticPattern(parseHapticSteps(command, length, 0));
+  }
+  else if (command[0] == 'A') {
+    // A - append steps to the pattern started by the preceding H
+    if (hapticStepCount == 0) {
+      return;
+    }
+    
+    // If the H steps already finished, the appended steps start now
+    bool finished = hapticStep >= hapticStepCount;
+    hapticStepCount = parseHapticSteps(command, length, hapticStepCount);
+    if (finished) {
+      hapticStepStart = millis();
+      writeMotors();
+    }
+  }
+  else if (strcmp(command, "VIBRATE_FRONT") == 0) {
+    startSingleVibration(0);
+  }
+  else if (strcmp(command, "VIBRATE_LEFT") == 0) {
+    startSingleVibration(1);
+  }
+  else if (strcmp(command, "VIBRATE_RIGHT") == 0) {
+    startSingleVibration(2);
+  }
+  // Add more commands as needed
 }
 
 void updateGPS() {
@@ -158,29 +304,19 @@ void updateGPS() {
 }
 
 void processSerialCommands() {
-  // Check if there are commands from Raspberry Pi
-  if (Serial.available() > 0) {
-    String command = Serial.readStringUntil('\n');
-    command.trim();
+  // Read whatever has arrived without waiting for the rest of the line
+  while (Serial.available() > 0) {
+    char c = Serial.read();
     
-    if (command == "VIBRATE_FRONT") {
-      // Vibrate front motor for 500ms
-      digitalWrite(VIBRATION_MOTOR_FRONT, HIGH);
-      delay(500);
-      digitalWrite(VIBRATION_MOTOR_FRONT, LOW);
-    }
-    else if (command == "VIBRATE_LEFT") {
-      // Vibrate left motor for 500ms
-      digitalWrite(VIBRATION_MOTOR_LEFT, HIGH);
-      delay(500);
-      digitalWrite(VIBRATION_MOTOR_LEFT, LOW);
+    if (c == '\n' || c == '\r') {
+      if (commandLength > 0) {
+        commandBuffer[commandLength] = '\0';
+        handleCommand(commandBuffer, commandLength);
+        commandLength = 0;
+      }
     }
-    else if (command == "VIBRATE_RIGHT") {
-      // Vibrate right motor for 500ms
-      digitalWrite(VIBRATION_MOTOR_RIGHT, HIGH);
-      delay(500);
-      digitalWrite(VIBRATION_MOTOR_RIGHT, LOW);
+    else if (commandLength < COMMAND_BUFFER_SIZE - 1) {
+      commandBuffer[commandLength++] = c;
     }
-    // Add more commands as needed
   }
 }
@@ -0,0 +1,180 @@
+import math
+import queue
+import threading
+import time
+
+# Motor order used in every step: (front, left, right)
+MOTORS = ('front', 'left', 'right')
+
+# The Arduino's serial receive buffer is only 64 bytes, so a single command
+# ("H" + 8 hex chars per step + newline) carries at most six steps
+MAX_COMMAND_STEPS = 6
+
+# Longer patterns are split into an "H" command followed by "A" (append)
+# commands; the Arduino buffers this many steps (MAX_HAPTIC_STEPS in the sketch)
+MAX_PATTERN_STEPS = 18
+
+# Step durations are sent in units of 10ms as two hex digits
+STEP_UNIT_MS = 10
+MAX_STEP_MS = 0xFF * STEP_UNIT_MS
+
+
+class HapticFeedback:
+    def __init__(self, arduino, coalesce_window=0.02):
+        # Any object with write() works here: a pyserial port, or a
+        # writer opened on the slave end of a pty for testing
+        self.arduino = arduino
+        self.coalesce_window = coalesce_window
+        self.pending = queue.Queue()
+        self.running = True
+        self.writer_thread = None
+
+        # Single writer thread so patterns never interleave on the wire
+        if self.arduino:
+            self.writer_thread = threading.Thread(target=self.write_commands)
+            self.writer_thread.daemon = True
+            self.writer_thread.start()
+
+    def play(self, steps):
+        """Queue a pattern given as (front, left, right, duration_ms) steps"""
+        steps = [part for step in steps for part in self.clamp_step(step)]
+        if len(steps) > MAX_PATTERN_STEPS:
+            raise ValueError(f"Haptic pattern has {len(steps)} steps, the maximum is {MAX_PATTERN_STEPS}")
+        if self.arduino and steps:
+            self.pending.put(steps)
+
+    def pulse(self, direction, count=1, intensity=255, on_ms=150, off_ms=100):
+        """Pulse one motor (or 'all') a number of times"""
+        level = self.levels(direction, intensity)
+        steps = []
+        for i in range(count):
+            steps.append(level + (on_ms,))
+            if i < count - 1:
+                steps.append((0, 0, 0, off_ms))
+        self.play(steps)
+
+    def ramp(self, direction, start=50, end=255, duration_ms=600, steps=4):
+        """Ramp one motor (or 'all') from start to end intensity"""
+        steps = max(1, min(steps, MAX_PATTERN_STEPS))
+        step_ms = duration_ms // steps
+        pattern = []
+        for i in range(steps):
+            if steps == 1:
+                intensity = end
+            else:
+                intensity = start + (end - start) * i // (steps - 1)
+            pattern.append(self.levels(direction, intensity) + (step_ms,))
+        self.play(pattern)
+
+    def turn_cue(self, turn):
+        """Play a navigation cue: 'left', 'right', 'straight' or 'arrived'"""
+        if turn == 'left':
+            self.pulse('left', count=2)
+        elif turn == 'right':
+            self.pulse('right', count=2)
+        elif turn == 'straight':
+            self.pulse('front', count=1, on_ms=300)
+        elif turn == 'arrived':
+            self.pulse('all', count=3, on_ms=100, off_ms=100)
+
+    def levels(self, direction, intensity):
+        """Return (front, left, right) levels for a direction"""
+        if direction == 'all':
+            return (intensity,) * len(MOTORS)
+        return tuple(intensity if motor == direction else 0 for motor in MOTORS)
+
+    def clamp_step(self, step):
+        """Clamp intensities to 0-255 and split duration into whole protocol ticks"""
+        front, left, right, duration_ms = step
+        levels = tuple(max(0, min(255, int(level))) for level in (front, left, right))
+        # Rounding half-up here keeps every boundary in overlay() on the tick grid
+        ticks = max(1, math.floor(duration_ms / STEP_UNIT_MS + 0.5))
+
+        # A step longer than one protocol step can carry becomes several steps
+        parts = []
+        while ticks > 0:
+            part = min(0xFF, ticks)
+            parts.append(levels + (part * STEP_UNIT_MS,))
+            ticks -= part
+        return parts
+
+    def coalesce(self, patterns):
+        """Overlay patterns that arrived together into a single timeline"""
+        # Always keep the newest pattern; older ones join only while the
+        # overlay still fits on the Arduino, so no cue is ever cut short
+        kept = [patterns[-1]]
+        for pattern in reversed(patterns[:-1]):
+            if len(self.overlay([pattern] + kept)) <= MAX_PATTERN_STEPS:
+                kept.insert(0, pattern)
+            else:
+                print("Haptic patterns overlap into too many steps, skipping an older pattern")
+        return self.overlay(kept)
+
+    def overlay(self, patterns):
+        """Merge patterns into one timeline, taking the strongest level per motor"""
+        # Collect every point in time where some pattern changes step
+        segments = []
+        for pattern in patterns:
+            start = 0
+            for step in pattern:
+                segments.append((start, start + step[3], step[:3]))
+                start += step[3]
+        boundaries = sorted({t for segment in segments for t in segment[:2]})
+
+        # Take the strongest level per motor within each interval
+        merged = []
+        for begin, end in zip(boundaries, boundaries[1:]):
+            level = [0] * len(MOTORS)
+            for seg_start, seg_end, seg_level in segments:
+                if seg_start <= begin and end <= seg_end:
+                    level = [max(a, b) for a, b in zip(level, seg_level)]
+            level = tuple(level)
+            if merged and merged[-1][:3] == level and merged[-1][3] + end - begin <= MAX_STEP_MS:
+                merged[-1] = level + (merged[-1][3] + end - begin,)
+            else:
+                merged.append(level + (end - begin,))
+        return merged
+
+    def encode(self, steps):
+        """Encode steps as an 'H' command line plus 'A' lines for the remainder"""
+        commands = []
+        for i in range(0, len(steps), MAX_COMMAND_STEPS):
+            command = "H" if i == 0 else "A"
+            for front, left, right, duration_ms in steps[i:i + MAX_COMMAND_STEPS]:
+                ticks = duration_ms // STEP_UNIT_MS
+                command += f"{front:02X}{left:02X}{right:02X}{ticks:02X}"
+            commands.append(command + "\n")
+        return commands
+
+    def write_commands(self):
+        """Drain queued patterns, coalesce them and write them as one batch"""
+        while self.running:
+            pattern = self.pending.get()
+            if pattern is None:
+                break
+
+            # Give patterns requested at the same moment a chance to batch up
+            time.sleep(self.coalesce_window)
+            patterns = [pattern]
+            while True:
+                try:
+                    pattern = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if pattern is None:
+                    self.running = False
+                    break
+                patterns.append(pattern)
+
+            commands = self.encode(self.coalesce(patterns))
+            try:
+                self.arduino.write("".join(commands).encode('ascii'))
+                self.arduino.flush()
+            except Exception as e:
+                print(f"Error writing to Arduino: {e}")
+
+    def stop(self):
+        """Stop the writer thread after pending patterns are sent"""
+        if self.writer_thread:
+            self.pending.put(None)
+            self.writer_thread.join(timeout=1)
@@ -13,6 +13,7 @@ from face_recognition import FaceRecognizer
 from gps_navigator import GPSNavigator
 from setup_wizard import SetupWizard
 from emergency_system import EmergencySystem
+from haptic_feedback import HapticFeedback
 
 class SmartGlasses:
     def __init__(self):
@@ -25,7 +26,8 @@ class SmartGlasses:
         
         # Initialize serial connection to Arduino
         try:
-            self.arduino = serial.Serial('/dev/ttyACM0', 9600, timeout=1)
+            port = self.config.get('arduino_port', '/dev/ttyACM0')
+            self.arduino = serial.Serial(port, 9600, timeout=1)
             time.sleep(2)  # Allow time for connection to establish
         except:
             print("Failed to connect to Arduino. Check connection and try again.")
@@ -37,6 +39,7 @@ class SmartGlasses:
         self.face_recognizer = FaceRecognizer(self.config)
         self.gps = GPSNavigator(self.config)
         self.emergency = EmergencySystem(self.config)
+        self.haptics = HapticFeedback(self.arduino)
         
         # Welcome message
         self.tts.speak(f"Hello {self.config['user_name']}, your smart glasses are ready.")
@@ -130,6 +133,7 @@ class SmartGlasses:
     def shutdown(self):
         """Clean shutdown of the system"""
         self.tts.speak("Shutting down smart glasses. Goodbye.")
+        self.haptics.stop()
         if self.arduino:
             self.arduino.close()
         # Additional cleanup as needed
@@ -0,0 +1,133 @@
+import os
+import pty
+import select
+import tty
+
+import pytest
+
+from haptic_feedback import HapticFeedback, MAX_PATTERN_STEPS
+
+
+@pytest.fixture
+def link():
+    """Pty standing in for the Arduino: haptics write to the slave end"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    port = open(os.ttyname(slave), 'wb', buffering=0)
+    haptics = HapticFeedback(port)
+    yield haptics, master
+    haptics.stop()
+    port.close()
+    os.close(slave)
+    os.close(master)
+
+
+def read_lines(master, count, timeout=2.0):
+    """Read count newline-terminated commands from the master end"""
+    data = b""
+    while data.count(b"\n") < count:
+        ready, _, _ = select.select([master], [], [], timeout)
+        if not ready:
+            break
+        data += os.read(master, 1024)
+    return data.decode('ascii').splitlines()
+
+
+def test_pulse(link):
+    haptics, master = link
+    haptics.pulse('left', count=2)
+    assert read_lines(master, 1) == ["H00FF000F0000000A00FF000F"]
+
+
+def test_ramp(link):
+    haptics, master = link
+    haptics.ramp('right', start=0, end=255, duration_ms=400, steps=2)
+    assert read_lines(master, 1) == ["H000000140000FF14"]
+
+
+def test_turn_cue(link):
+    haptics, master = link
+    haptics.turn_cue('arrived')
+    assert read_lines(master, 1) == ["HFFFFFF0A0000000AFFFFFF0A0000000AFFFFFF0A"]
+
+
+def test_coalesced_batch(link):
+    haptics, master = link
+    haptics.turn_cue('left')
+    haptics.pulse('front', on_ms=400)
+    assert read_lines(master, 1) == ["HFFFF000FFF00000AFFFF000F"]
+
+
+def test_durations_round_to_ticks(link):
+    haptics, master = link
+    haptics.ramp('front', start=255, end=255, duration_ms=1000, steps=3)
+    haptics.pulse('left', on_ms=83)
+    # 333ms rounds to 330ms, 83ms to 80ms; overlay boundaries stay on the grid
+    assert read_lines(master, 1) == ["HFFFF0008FF00005B"]
+
+
+def test_durations_round_half_up(link):
+    haptics, master = link
+    haptics.play([(255, 0, 0, 25), (0, 0, 0, 35)])
+    assert read_lines(master, 1) == ["HFF00000300000004"]
+
+
+def test_long_step_splits_instead_of_clamping(link):
+    haptics, master = link
+    haptics.pulse('front', on_ms=5000)
+    assert read_lines(master, 1) == ["HFF0000FFFF0000F5"]
+
+
+def test_long_ramp_keeps_full_duration(link):
+    haptics, master = link
+    haptics.ramp('front', start=255, end=255, duration_ms=12000, steps=4)
+    # Four 3000ms steps become eight, sent as an H line and an A line
+    lines = read_lines(master, 2)
+    assert [line[0] for line in lines] == ["H", "A"]
+    ticks = [int(line[i + 6:i + 8], 16) for line in lines for i in range(1, len(line), 8)]
+    assert sum(ticks) * 10 == 12000
+
+
+def test_overlay_over_step_cap_keeps_newest_pattern_whole(link):
+    haptics, master = link
+    haptics.coalesce_window = 0.2
+    older = [(255, 0, 0, 100) if i % 2 == 0 else (0, 0, 0, 100) for i in range(18)]
+    newer = [(0, 255, 0, 150) if i % 2 == 0 else (0, 0, 0, 150) for i in range(18)]
+    haptics.play(older)
+    haptics.play(newer)
+    # Overlaying both needs 30 steps, so the older pattern is left out
+    steps = "00FF000F0000000F" * 3
+    assert read_lines(master, 3) == ["H" + steps, "A" + steps, "A" + steps]
+
+
+def test_long_pattern_splits_into_append_commands(link):
+    haptics, master = link
+    haptics.pulse('left', count=4)
+    assert read_lines(master, 2) == [
+        "H00FF000F0000000A00FF000F0000000A00FF000F0000000A",
+        "A00FF000F",
+    ]
+
+
+def test_pattern_over_step_cap_is_rejected(link):
+    haptics, master = link
+    with pytest.raises(ValueError):
+        haptics.play([(255, 0, 0, 100)] * (MAX_PATTERN_STEPS + 1))
+    with pytest.raises(ValueError):
+        haptics.pulse('left', count=10)
+
+
+def test_stop_flushes_pending_patterns(link):
+    haptics, master = link
+    haptics.coalesce_window = 0.2
+    haptics.turn_cue('right')
+    haptics.stop()
+    assert not haptics.writer_thread.is_alive()
+    assert read_lines(master, 1, timeout=0.1) == ["H0000FF0F0000000A0000FF0F"]
+
+
+def test_no_writer_without_port():
+    haptics = HapticFeedback(None)
+    haptics.turn_cue('left')
+    haptics.stop()
+    assert haptics.writer_thread is None